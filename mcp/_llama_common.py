@@ -0,0 +1,182 @@
+"""
+Shared helpers for the llama-spark MCP servers.
+
+State-file handling for the llama-server managed by the plugin scripts,
+plus the pooled httpx client factory used by both the llama and vLLM
+servers.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+import msgspec
+import orjson
+
+# State file written by llama-serve.sh; the str form is cached so the
+# hot path never rebuilds Path objects
+STATE_FILE = Path.home() / ".llama-server-state.json"
+_STATE_PATH = str(STATE_FILE)
+DEFAULT_TIMEOUT = 120.0  # Long timeout for slow generations
+
+# Only ever talk to a local server. Normalized (lowercased, no trailing
+# dot) once at import so the per-call check stays a single hash lookup
+ALLOWED_HOSTS = frozenset({"127.0.0.1", "localhost", "0.0.0.0", "::1"})
+_ALLOWED = frozenset(h.lower().rstrip(".") for h in ALLOWED_HOSTS)
+
+# Shared HTTP clients, keyed by base URL so a host/port change in the
+# state file gets a fresh connection pool instead of a stale one
+_clients: dict[str, httpx.AsyncClient] = {}
+
+# (state, base_url, error) keyed by (st_mtime_ns, st_size) so back-to-back
+# tool calls skip the JSON parse, /proc check, and URL build while the
+# file is unchanged
+_state_cache: tuple[tuple[int, int], tuple[dict | None, str | None, str | None]] | None = None
+
+
+def client_for(base_url: str) -> httpx.AsyncClient:
+    """Get (or lazily create) the shared keep-alive client for a base URL.
+
+    The base URL and JSON headers are set on the client once, so call
+    sites pass relative paths and no per-request header dict.
+    """
+    client = _clients.get(base_url)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=DEFAULT_TIMEOUT,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=8,
+                keepalive_expiry=30,
+            ),
+        )
+        _clients[base_url] = client
+    return client
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """FastMCP lifespan hook: close pooled connections on shutdown."""
+    try:
+        yield
+    finally:
+        for client in _clients.values():
+            await client.aclose()
+        _clients.clear()
+
+
+def server_info() -> tuple[dict | None, str | None, str | None]:
+    """Read the state written by llama-serve.sh, validating the PID.
+
+    Returns (state, base_url, error) with the base URL derived once per
+    state-file change, so steady-state tool calls pay one stat and one
+    /proc existence check.
+    """
+    global _state_cache
+
+    try:
+        st = os.stat(_STATE_PATH)
+    except OSError:
+        return (None, *get_base_url(None))
+
+    cache_key = (st.st_mtime_ns, st.st_size)
+    if _state_cache is not None and _state_cache[0] == cache_key:
+        info = _state_cache[1]
+        state = info[0]
+        # Still trust the cache only while the recorded PID is alive
+        if state is None or os.path.exists(f"/proc/{state.get('pid')}"):
+            return info
+
+    try:
+        with open(_STATE_PATH, "rb") as f:
+            state = orjson.loads(f.read())
+    except (orjson.JSONDecodeError, OSError):
+        return (None, *get_base_url(None))
+
+    if not state.get("pid"):
+        state = None
+    else:
+        # Make sure the PID still belongs to llama-server (not a recycled
+        # PID). Only the program name matters, so a small binary read is enough
+        try:
+            with open(f"/proc/{state['pid']}/cmdline", "rb") as f:
+                if b"llama-server" not in f.read(256):
+                    state = None
+        except OSError:  # Includes FileNotFoundError: process is gone
+            state = None
+
+    info = (state, *get_base_url(state))
+    _state_cache = (cache_key, info)
+    return info
+
+
+# Typed shapes for stream chunks: msgspec decodes straight into these
+# without building intermediate dicts, and unknown fields are ignored
+
+
+class _StreamDelta(msgspec.Struct):
+    content: str | None = None
+
+
+class _StreamChoice(msgspec.Struct):
+    delta: _StreamDelta | None = None  # chat chunks
+    text: str | None = None  # completion chunks
+
+
+class StreamChunk(msgspec.Struct):
+    """One OpenAI-style SSE chunk from /v1/chat/completions or /v1/completions."""
+    choices: list[_StreamChoice] = []
+
+
+class LlamaChunk(msgspec.Struct):
+    """One native llama.cpp SSE chunk from /completion."""
+    content: str | None = None
+    stop: bool = False
+
+
+decode_stream_chunk = msgspec.json.Decoder(StreamChunk).decode
+decode_llama_chunk = msgspec.json.Decoder(LlamaChunk).decode
+
+# Roles the chat endpoints accept, checked client-side before the network hop
+_VALID_ROLES = frozenset({"user", "assistant", "system", "tool"})
+
+
+def validate_messages(messages) -> str | None:
+    """Check chat message shapes client-side. Returns an error string or None.
+
+    Catching malformed messages here avoids a full round-trip that would
+    only come back as a truncated HTTP 400.
+    """
+    if not isinstance(messages, list) or not messages:
+        return "Error: messages must be a non-empty list of {'role', 'content'} dicts."
+    for i, msg in enumerate(messages):
+        if not isinstance(msg, dict):
+            return f"Error: messages[{i}] is not a dict."
+        if msg.get("role") not in _VALID_ROLES:
+            return f"Error: messages[{i}] has invalid role {msg.get('role')!r}."
+        if not isinstance(msg.get("content"), (str, list)):
+            return f"Error: messages[{i}] content must be a string or a content-part list."
+    return None
+
+
+def get_base_url(state: dict | None) -> tuple[str | None, str | None]:
+    """Build the server base URL from state. Returns (url, error)."""
+    if state is None:
+        return None, "llama-server is not running. Start it with /llama:serve <model>."
+
+    host = state.get("host", "127.0.0.1")
+    port = state.get("port")
+    if not port:
+        return None, "Error: State file is missing the server port."
+
+    # Accept case variants, bracketed IPv6, and trailing dots
+    h = host.lower().rstrip(".").strip("[]")
+    if h not in _ALLOWED:
+        return None, f"Error: Refusing to connect to non-local host '{host}'."
+
+    if ":" in h:
+        return f"http://[{h}]:{port}", None
+    return f"http://{h}:{port}", None
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+MCP server for llama.cpp inference on DGX Spark.
+
+Connects to the llama-server instance managed by the plugin scripts
+(state file written by llama-serve.sh) and exposes chat/completion
+via the Model Context Protocol.
+"""
+
+import json
+
+import httpx
+import msgspec
+import orjson
+from mcp.server.fastmcp import FastMCP
+
+from _llama_common import (
+    DEFAULT_TIMEOUT,
+    client_for,
+    decode_llama_chunk,
+    decode_stream_chunk,
+    lifespan,
+    server_info,
+    validate_messages,
+)
+
+mcp = FastMCP("llama", lifespan=lifespan)
+
+
+@mcp.tool()
+async def llama_status(verbose: bool = False) -> str:
+    """
+    Check if the local llama-server is running and return its status.
+
+    Args:
+        verbose: Fetch the full /health body from the server. The default
+                 is a HEAD probe with a tight connect timeout, which
+                 answers "is it up?" in ~1 RTT instead of waiting out the
+                 full timeout against a dead server.
+    """
+    state, base_url, err = server_info()
+    if err:
+        return err
+
+    try:
+        client = client_for(base_url)
+        if verbose:
+            resp = await client.get("/health", timeout=5.0)
+            resp.raise_for_status()
+            status = orjson.loads(resp.content).get("status", "ok")
+        else:
+            resp = await client.head("/health", timeout=httpx.Timeout(1.0, connect=0.25))
+            resp.raise_for_status()
+            status = "ok"
+
+        return orjson.dumps({
+            "status": status,
+            "model": state.get("model"),
+            "pid": state.get("pid"),
+            "port": state.get("port"),
+            "started_at": state.get("started_at"),
+            "url": base_url,
+        }, option=orjson.OPT_INDENT_2).decode()
+
+    except httpx.HTTPStatusError as e:
+        return f"llama-server health check failed: HTTP {e.response.status_code}"
+    except httpx.RequestError as e:
+        return f"llama-server at {base_url} is not responding: {e}"
+    except json.JSONDecodeError as e:
+        return f"Error: Invalid health response from llama-server: {e}"
+
+
+@mcp.tool()
+async def llama_chat(
+    messages: list[dict],
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    system_prompt: str | None = None,
+) -> str:
+    """
+    Send a chat completion request to the local llama-server.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content' keys.
+                  Roles: 'user', 'assistant', 'system'
+        temperature: Sampling temperature (0.0-2.0, default 0.7)
+        max_tokens: Maximum tokens to generate (default 2048)
+        system_prompt: Optional system prompt prepended to messages
+                       (ignored if messages already starts with a system message)
+
+    Returns:
+        The assistant's response text, or an error message.
+
+    Example:
+        llama_chat([{"role": "user", "content": "Explain quicksort"}])
+    """
+    state, base_url, err = server_info()
+    if err:
+        return err
+
+    # Prepend system prompt only if provided AND messages doesn't already have one
+    if system_prompt and (not messages or messages[0].get("role") != "system"):
+        messages = [{"role": "system", "content": system_prompt}] + messages
+
+    err = validate_messages(messages)
+    if err:
+        return err
+
+    payload = {
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+    try:
+        client = client_for(base_url)
+        parts: list[str] = []
+        async with client.stream(
+            "POST",
+            "/v1/chat/completions",
+            content=orjson.dumps(payload),
+        ) as resp:
+            if resp.status_code >= 400:
+                await resp.aread()  # Buffer the body so the handler can report it
+            resp.raise_for_status()
+
+            # Accumulate SSE delta chunks as they arrive
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                chunk = line[6:]
+                if chunk == "[DONE]":
+                    break
+                choices = decode_stream_chunk(chunk).choices
+                if choices and choices[0].delta is not None:
+                    parts.append(choices[0].delta.content or "")
+
+        if not parts:
+            return "Error: No response from model"
+
+        return "".join(parts)
+
+    except httpx.TimeoutException:
+        return f"Error: Request timed out after {DEFAULT_TIMEOUT}s. Model may be overloaded."
+    except httpx.HTTPStatusError as e:
+        return f"Error: HTTP {e.response.status_code} - {e.response.text[:500]}"
+    except httpx.RequestError as e:
+        return f"Error: Could not connect to llama-server at {base_url}: {e}"
+    except (json.JSONDecodeError, msgspec.DecodeError, KeyError) as e:
+        return f"Error: Invalid response from llama-server: {e}"
+
+
+@mcp.tool()
+async def llama_complete(
+    prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    stop: list[str] | None = None,
+) -> str:
+    """
+    Send a raw completion request to the local llama-server.
+
+    Uses the native llama.cpp /completion endpoint.
+
+    Args:
+        prompt: The text prompt to complete
+        temperature: Sampling temperature (0.0-2.0, default 0.7)
+        max_tokens: Maximum tokens to generate (default 2048)
+        stop: Optional list of stop sequences
+
+    Returns:
+        The generated completion text, or an error message.
+    """
+    state, base_url, err = server_info()
+    if err:
+        return err
+
+    payload = {
+        "prompt": prompt,
+        "temperature": temperature,
+        "n_predict": max_tokens,
+        "stream": True,
+    }
+    if stop:
+        payload["stop"] = stop
+
+    try:
+        client = client_for(base_url)
+        parts: list[str] = []
+        async with client.stream(
+            "POST",
+            "/completion",
+            content=orjson.dumps(payload),
+        ) as resp:
+            if resp.status_code >= 400:
+                await resp.aread()  # Buffer the body so the handler can report it
+            resp.raise_for_status()
+
+            # Native llama.cpp streaming: one {"content", "stop"} chunk per line
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                chunk = decode_llama_chunk(line[6:])
+                parts.append(chunk.content or "")
+                if chunk.stop:
+                    break
+
+        return "".join(parts)
+
+    except httpx.TimeoutException:
+        return f"Error: Request timed out after {DEFAULT_TIMEOUT}s. Model may be overloaded."
+    except httpx.HTTPStatusError as e:
+        return f"Error: HTTP {e.response.status_code} - {e.response.text[:500]}"
+    except httpx.RequestError as e:
+        return f"Error: Could not connect to llama-server at {base_url}: {e}"
+    except (json.JSONDecodeError, msgspec.DecodeError, KeyError) as e:
+        return f"Error: Invalid response from llama-server: {e}"
+
+
+if __name__ == "__main__":
+    mcp.run()
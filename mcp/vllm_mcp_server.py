@@ -8,29 +8,52 @@ via the Model Context Protocol.
 
 import json
 import os
+import time
+
 import httpx
+import msgspec
+import orjson
 from mcp.server.fastmcp import FastMCP
 
+from _llama_common import (
+    DEFAULT_TIMEOUT,
+    client_for,
+    decode_stream_chunk,
+    lifespan,
+    validate_messages,
+)
+
 # vLLM server configuration
 VLLM_URL = os.environ.get("VLLM_URL", "http://localhost:8000")
-DEFAULT_TIMEOUT = 120.0  # Long timeout for slow generations
 
-mcp = FastMCP("vllm")
+mcp = FastMCP("vllm", lifespan=lifespan)
+
+# Cached model list as (monotonic_ts, models), refetched after the TTL
+_model_cache: tuple[float, list[dict]] | None = None
+_default_model: str | None = None
+MODEL_CACHE_TTL = 30.0
 
-# Cache for model info (refreshed on status check)
-_model_cache: dict | None = None
+
+def _invalidate_model_cache() -> None:
+    """Drop cached model info, e.g. after a failed request."""
+    global _model_cache, _default_model
+    _model_cache = None
+    _default_model = None
 
 
 async def _get_models() -> list[dict]:
     """Fetch available models from vLLM server."""
-    global _model_cache
+    global _model_cache, _default_model
+    if _model_cache is not None and time.monotonic() - _model_cache[0] < MODEL_CACHE_TTL:
+        return _model_cache[1]
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{VLLM_URL}/v1/models")
-            if resp.status_code == 200:
-                data = resp.json()
-                _model_cache = data
-                return data.get("data", [])
+        client = client_for(VLLM_URL)
+        resp = await client.get("/v1/models", timeout=5.0)
+        if resp.status_code == 200:
+            models = orjson.loads(resp.content).get("data", [])
+            _model_cache = (time.monotonic(), models)
+            _default_model = models[0].get("id") if models else None
+            return models
     except (httpx.RequestError, json.JSONDecodeError):
         pass
     return []
@@ -38,6 +61,8 @@ async def _get_models() -> list[dict]:
 
 async def _get_default_model() -> str | None:
     """Get the first available model from vLLM."""
+    if _default_model is not None:
+        return _default_model
     models = await _get_models()
     if models:
         return models[0].get("id")
@@ -53,12 +78,12 @@ async def vllm_status() -> str:
             return f"vLLM server at {VLLM_URL} is not responding or has no models loaded."
 
         model_list = [m.get("id", "unknown") for m in models]
-        return json.dumps({
+        return orjson.dumps({
             "status": "running",
             "url": VLLM_URL,
             "models": model_list,
             "default_model": model_list[0] if model_list else None,
-        }, indent=2)
+        }, option=orjson.OPT_INDENT_2).decode()
 
     except httpx.RequestError as e:
         return f"vLLM server at {VLLM_URL} is not responding: {e}"
@@ -100,41 +125,55 @@ async def vllm_chat(
     if system_prompt and (not messages or messages[0].get("role") != "system"):
         messages = [{"role": "system", "content": system_prompt}] + messages
 
+    err = validate_messages(messages)
+    if err:
+        return err
+
     payload = {
         "model": model,
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens,
-        "stream": False,
+        "stream": True,
     }
 
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            resp = await client.post(
-                f"{VLLM_URL}/v1/chat/completions",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
+        client = client_for(VLLM_URL)
+        parts: list[str] = []
+        async with client.stream(
+            "POST",
+            "/v1/chat/completions",
+            content=orjson.dumps(payload),
+        ) as resp:
+            if resp.status_code >= 400:
+                await resp.aread()  # Buffer the body so the handler can report it
             resp.raise_for_status()
-            data = resp.json()
 
-            # Extract response text
-            choices = data.get("choices", [])
-            if not choices:
-                return "Error: No response from model"
+            # Accumulate SSE delta chunks as they arrive
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                chunk = line[6:]
+                if chunk == "[DONE]":
+                    break
+                choices = decode_stream_chunk(chunk).choices
+                if choices and choices[0].delta is not None:
+                    parts.append(choices[0].delta.content or "")
 
-            message = choices[0].get("message", {})
-            content = message.get("content", "")
+        if not parts:
+            return "Error: No response from model"
 
-            return content
+        return "".join(parts)
 
     except httpx.TimeoutException:
         return f"Error: Request timed out after {DEFAULT_TIMEOUT}s. Model may be overloaded."
     except httpx.HTTPStatusError as e:
+        _invalidate_model_cache()
         return f"Error: HTTP {e.response.status_code} - {e.response.text[:500]}"
     except httpx.RequestError as e:
+        _invalidate_model_cache()
         return f"Error: Could not connect to vLLM at {VLLM_URL}: {e}"
-    except (json.JSONDecodeError, KeyError) as e:
+    except (json.JSONDecodeError, msgspec.DecodeError, KeyError) as e:
         return f"Error: Invalid response from vLLM: {e}"
 
 
@@ -170,35 +209,48 @@ async def vllm_complete(
         "prompt": prompt,
         "temperature": temperature,
         "max_tokens": max_tokens,
-        "stream": False,
+        "stream": True,
     }
     if stop:
         payload["stop"] = stop
 
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            resp = await client.post(
-                f"{VLLM_URL}/v1/completions",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
+        client = client_for(VLLM_URL)
+        parts: list[str] = []
+        async with client.stream(
+            "POST",
+            "/v1/completions",
+            content=orjson.dumps(payload),
+        ) as resp:
+            if resp.status_code >= 400:
+                await resp.aread()  # Buffer the body so the handler can report it
             resp.raise_for_status()
-            data = resp.json()
 
-            # Extract completion text
-            choices = data.get("choices", [])
-            if not choices:
-                return "Error: No response from model"
+            # Accumulate SSE text chunks as they arrive
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                chunk = line[6:]
+                if chunk == "[DONE]":
+                    break
+                choices = decode_stream_chunk(chunk).choices
+                if choices:
+                    parts.append(choices[0].text or "")
+
+        if not parts:
+            return "Error: No response from model"
 
-            return choices[0].get("text", "")
+        return "".join(parts)
 
     except httpx.TimeoutException:
         return f"Error: Request timed out after {DEFAULT_TIMEOUT}s. Model may be overloaded."
     except httpx.HTTPStatusError as e:
+        _invalidate_model_cache()
         return f"Error: HTTP {e.response.status_code} - {e.response.text[:500]}"
     except httpx.RequestError as e:
+        _invalidate_model_cache()
         return f"Error: Could not connect to vLLM at {VLLM_URL}: {e}"
-    except (json.JSONDecodeError, KeyError) as e:
+    except (json.JSONDecodeError, msgspec.DecodeError, KeyError) as e:
         return f"Error: Invalid response from vLLM: {e}"
 
 
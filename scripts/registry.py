@@ -17,13 +17,20 @@ import argparse
 import tempfile
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    # The shell scripts invoke this under the system python3, which may
+    # not have orjson; fall back to stdlib json
+    orjson = None
+
 CONFIG_FILE = Path.home() / "llama-spark-plugin" / "config" / "models.json"
 
 
 def load_config():
     """Load the models configuration."""
     if not CONFIG_FILE.exists():
-        return {
+        config = {
             "models_dir": str(Path.home() / "models"),
             "models": {},
             "defaults": {
@@ -35,19 +42,43 @@ def load_config():
                 "flash_attn": True
             }
         }
-    with open(CONFIG_FILE) as f:
-        return json.load(f)
+    else:
+        with open(CONFIG_FILE) as f:
+            config = json.load(f)
+
+    # Runtime-only alias -> name index for O(1) lookups (stripped on save)
+    config["_alias_index"] = {
+        alias: name
+        for name, info in config["models"].items()
+        for alias in info.get("aliases", [])
+    }
+    return config
+
 
+def save_config(config, durable=False):
+    """Save the models configuration atomically.
 
-def save_config(config):
-    """Save the models configuration atomically."""
+    Serializes to a single buffer and issues one write rather than
+    streaming through the indent machinery. Pass durable=True to fsync
+    before the rename; the default skips it since the registry is not
+    transactional and a crash just loses the last add/remove.
+    """
+    config.pop("_alias_index", None)
+    # Persist the display order so `list` can skip sorting
+    config["_sorted"] = sorted(config["models"])
     CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        data = (json.dumps(config, indent=2) + "\n").encode()
     # Write to temp file first, then atomic rename to prevent corruption
     fd, tmp_path = tempfile.mkstemp(dir=CONFIG_FILE.parent, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w") as f:
-            json.dump(config, f, indent=2)
-            f.write("\n")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
         os.replace(tmp_path, CONFIG_FILE)
     except Exception:
         os.unlink(tmp_path)
@@ -101,17 +132,31 @@ def list_models(args):
     config = load_config()
     models_dir = config.get("models_dir", "")
 
-    if not config["models"]:
+    models = config["models"]
+    if not models:
         print("No models registered.")
         return
 
-    for name, info in sorted(config["models"].items()):
+    # Scan the models dir once instead of an exists() stat per entry
+    try:
+        with os.scandir(models_dir) as entries:
+            dir_names = {entry.name for entry in entries}
+    except OSError:
+        dir_names = set()
+
+    for name in config.get("_sorted") or sorted(models):
+        info = models.get(name)
+        if info is None:
+            continue
+
         path = info["path"]
         if not path.startswith("/"):
+            rel = path
             path = f"{models_dir}/{path}"
-
-        # Check if file exists
-        exists = Path(path).exists()
+            # Single-component paths are covered by the scan; nested ones fall back
+            exists = rel in dir_names if "/" not in rel else os.path.exists(path)
+        else:
+            exists = os.path.exists(path)
         status = "" if exists else " [MISSING]"
 
         aliases = info.get("aliases", [])
@@ -136,12 +181,13 @@ def get_model(args):
         print(json.dumps(info, indent=2))
         return
 
-    # Alias lookup
-    for name, info in config["models"].items():
-        if args.name in info.get("aliases", []):
-            info["_name"] = name
-            print(json.dumps(info, indent=2))
-            return
+    # Alias lookup via the prebuilt index
+    name = config["_alias_index"].get(args.name)
+    if name is not None:
+        info = config["models"][name]
+        info["_name"] = name
+        print(json.dumps(info, indent=2))
+        return
 
     print(f"Model '{args.name}' not found", file=sys.stderr)
     sys.exit(1)